@@ -8,38 +8,50 @@ functions:
     * read_csv - Read data from CSV file and return it as a list
     * print_data_csv - Print data in csv format
     * get_columns - Get column names of data
+    * get_column_values - Get values of single column of data
     * get_shape - Get number of rows and columns of data
     * data_info - Print data summary info
     * get_sorted_data - Get sorted data by column and order
+    * get_top_data - Get n rows with the largest values of column
     * get_groupped_data - Group data by column and apply aggregation function
     * get_groupped_data_from_file - Returns froupped data from file
-    * merged_data - Merge Join two sorted datasets (tables) into one on unique key
+    * get_groupped_data_cached - Returns groupped data from cache or file
+    * merged_data - Merge or Hash Join two datasets (tables) into one on unique key
     * get_factorized_data - Factorize column of data which contains multiple categorical data by splitting it on list of categories
     * get_categories_of_column - Get list of unique categories of non-atomic column which contains multiple categorical values splitted by delimiter
     * get_data_with_splitted_col - Split column of data and create new column by regular expression
     * filtered_data_col_contains - Filter data in condition if column contains substring
+    * splitted_data_col_contains - Split data into parts in condition if column contains each of substrings
+    * get_top_data_col_contains - Get top n rows for each of substrings contained in column
     * filtered_data_col_in_range - Filter data by slicing integer column
     * stacked_data - Return vertically stacked data
     * sliced_data - Dataset safe slicing method
+    * positive_int - Convert argument to positive integer
     * get_arguments - Construct the argument parser and get the arguments
     * main - the main function of the script
 """
 
 
 # import the necessary packages
+import os
+import sys
 import csv
 import re
 import time
 import argparse
+import tempfile
 import logging as log
-from itertools import groupby
-from statistics import mean
+from itertools import groupby, compress, chain
+from operator import itemgetter
+from heapq import nlargest, heappush, heapreplace
+from concurrent.futures import ProcessPoolExecutor
 
 
 DATA_FOLDER_PATH = 'data/ml-latest-small/'
+REGEX_META_CHARS = frozenset('.^$*+?{}[]\\|()')
 
 
-def read_csv(file_path: str, delimiter: str = ',', columns: list = None, encoding: str = 'ascii') -> list:
+def read_csv(file_path: str, delimiter: str = ',', columns: list = None, encoding: str = 'ascii', dtypes: dict = None) -> list:
     """Read data from CSV file and return it as a list
 
     Parameters
@@ -52,6 +64,9 @@ def read_csv(file_path: str, delimiter: str = ',', columns: list = None, encodin
         Columns to read from file, by default None
     encoding : str, optional
         File encoding method, by default 'ascii'
+    dtypes : dict, optional
+        Types to convert column values to once on reading, empty values
+        become None, by default None (all values are strings)
 
     Returns
     -------
@@ -61,20 +76,99 @@ def read_csv(file_path: str, delimiter: str = ',', columns: list = None, encodin
     data = []
     try:
         with open(file_path, newline='') as csvfile:
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
+            reader = csv.reader(csvfile, delimiter=delimiter)
+            header = next(reader)
             if columns:
-                for row in reader:
-                    data_row = {col: row.get(col) for col in columns}
-                    data.append(data_row)
+                # read only requested columns by their position in header
+                idx = [header.index(col) for col in columns]
+                data = [dict(zip(columns, [row[i] for i in idx]))
+                        for row in reader if row]
             else:
-                data = [row for row in reader]
+                data = [dict(zip(header, row)) for row in reader if row]
+
+            if dtypes:
+                for row in data:
+                    for col, dtype in dtypes.items():
+                        row[col] = dtype(row[col]) if row[col] else None
     except Exception as e:
         log.exception(e)
 
     return data
 
 
-def get_groupped_data_from_file(file_path: str, group_by: str, agg_col: str, delimiter: str = ',') -> list:
+def _groupped_sums(rows, group_idx: int, agg_idx: int, keys: set = None) -> dict:
+    """Accumulate running sum and count of aggregation column per group
+
+    Parameters
+    ----------
+    rows : iterable
+        Rows of csv file stored as lists of values
+    group_idx : int
+        Index of group by column
+    agg_idx : int
+        Index of aggregation column
+    keys : set, optional
+        Only rows with group by value in keys are aggregated, by default None
+
+    Returns
+    -------
+    dict
+        Tuples of sum and count stored by group value
+    """
+    group_vals = {}
+    for row in rows:
+        if not row:
+            continue
+        gr_val = row[group_idx]
+        if keys is not None and gr_val not in keys:
+            continue
+        agg_sum, agg_count = group_vals.get(gr_val, (0.0, 0))
+        group_vals[gr_val] = (agg_sum + float(row[agg_idx]), agg_count + 1)
+
+    return group_vals
+
+
+def _groupped_sums_of_chunk(file_path: str, start: int, end: int, group_idx: int, agg_idx: int, delimiter: str = ',', keys: set = None) -> dict:
+    """Accumulate running sum and count per group for lines of file which
+    start in byte range [start, end)
+
+    Parameters
+    ----------
+    file_path : str
+        File name to read
+    start : int
+        Byte offset of chunk start
+    end : int
+        Byte offset of chunk end
+    group_idx : int
+        Index of group by column
+    agg_idx : int
+        Index of aggregation column
+    delimiter : str, optional
+        Delimiter of csv file, by default ','
+    keys : set, optional
+        Only rows with group by value in keys are aggregated, by default None
+
+    Returns
+    -------
+    dict
+        Tuples of sum and count stored by group value
+    """
+    lines = []
+    with open(file_path, 'rb') as f:
+        # resynchronize on the first line which starts inside of chunk
+        f.seek(start - 1)
+        f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line.decode())
+
+    return _groupped_sums(csv.reader(lines, delimiter=delimiter), group_idx, agg_idx, keys)
+
+
+def get_groupped_data_from_file(file_path: str, group_by: str, agg_col: str, delimiter: str = ',', keys: set = None, n_jobs: int = 1, group_dtype: type = str) -> list:
     """Returns groupped data with two columns from file. Optimized algorithm 
     of reading and groupping with mean operations.
 
@@ -88,6 +182,13 @@ def get_groupped_data_from_file(file_path: str, group_by: str, agg_col: str, del
         Aggregation column name
     delimiter : str, optional
         Delimiter of csv file, by default ','
+    keys : set, optional
+        Only rows with group by value in keys are aggregated, by default None
+    n_jobs : int, optional
+        Number of processes parsing chunks of file in parallel, by default 1.
+        Chunks are split on line breaks, so values must not contain them
+    group_dtype : type, optional
+        Type to convert group by values to, by default str
 
     Returns
     -------
@@ -96,23 +197,109 @@ def get_groupped_data_from_file(file_path: str, group_by: str, agg_col: str, del
     """
     data = []
     try:
+        # group raw strings and convert only one value per group at the end
+        if keys is not None:
+            keys = {str(key) for key in keys}
+
         with open(file_path, newline='') as csvfile:
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
+            header_line = csvfile.readline()
+            header = next(csv.reader([header_line], delimiter=delimiter))
+            group_idx = header.index(group_by)
+            agg_idx = header.index(agg_col)
+
+            # keep running sum and count per group instead of all values
+            if n_jobs > 1:
+                data_start = len(header_line.encode())
+                file_size = os.path.getsize(file_path)
+                step = max((file_size - data_start) // n_jobs, 1)
+                bounds = list(range(data_start, file_size, step)) + [file_size]
+
+                group_vals = {}
+                with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                    futures = [executor.submit(_groupped_sums_of_chunk, file_path, start, end,
+                                               group_idx, agg_idx, delimiter, keys)
+                               for start, end in zip(bounds[:-1], bounds[1:])]
+                    # merge partial sums in order of chunks to keep groups order
+                    for future in futures:
+                        chunk_vals = future.result()
+                        for gr_val, (s, c) in chunk_vals.items():
+                            agg_sum, agg_count = group_vals.get(gr_val, (0.0, 0))
+                            group_vals[gr_val] = (agg_sum + s, agg_count + c)
+            else:
+                group_vals = _groupped_sums(
+                    csv.reader(csvfile, delimiter=delimiter), group_idx, agg_idx, keys)
+
+            data = [{group_by: group_dtype(k), agg_col: round(s / c, 4)}
+                    for k, (s, c) in group_vals.items()]
+    except Exception as e:
+        log.exception(e)
+
+    return data
 
-            group_vals = {}
-            for row in reader:
-                gr_val = row.get(group_by)
-                agg_val = float(row.get(agg_col))
 
-                if gr_val in group_vals.keys():
-                    group_vals[gr_val] += [agg_val]
-                else:
-                    group_vals[gr_val] = [agg_val]
+def get_groupped_data_cached(file_path: str, group_by: str, agg_col: str, cache_path: str, delimiter: str = ',', n_jobs: int = 1, group_dtype: type = str) -> list:
+    """Returns groupped data with two columns from cache file if it is newer
+    than source file, otherwise groups source file and saves result to cache
+
+    Parameters
+    ----------
+    file_path : str
+        File name to read
+    group_by : str
+        Group by column name
+    agg_col : str
+        Aggregation column name
+    cache_path : str
+        File name of cached groupped data
+    delimiter : str, optional
+        Delimiter of csv file, by default ','
+    n_jobs : int, optional
+        Number of processes parsing chunks of file in parallel, by default 1
+    group_dtype : type, optional
+        Type to convert group by values to, by default str
+
+    Returns
+    -------
+    list
+        Data stored in list of dicts
+    """
+    # cache can`t be checked without source file, fail like reading it directly
+    try:
+        is_cache_fresh = (os.path.exists(cache_path)
+                          and os.path.getmtime(cache_path) >= os.path.getmtime(file_path))
+    except Exception as e:
+        log.exception(e)
+        return []
+
+    if is_cache_fresh:
+        log.debug(f'reading cache {cache_path}')
+        return read_csv(cache_path, dtypes={group_by: group_dtype, agg_col: float})
+
+    # keep cache sorted by group so it can be merge joined
+    data = get_sorted_data(
+        get_groupped_data_from_file(file_path, group_by, agg_col, delimiter,
+                                    n_jobs=n_jobs, group_dtype=group_dtype),
+        group_by, reverse=False)
+    # failed aggregation is logged and returns no rows, don`t cache it
+    if not data:
+        return data
 
-            for k, v in group_vals.items():
-                data.append({group_by: k, agg_col: round(sum(v)/len(v), 4)})
+    # write to temporary file first so cache is never left partially written
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile('w', newline='', delete=False,
+                                         dir=os.path.dirname(cache_path) or '.',
+                                         prefix=os.path.basename(cache_path),
+                                         suffix='.tmp') as csvfile:
+            tmp_path = csvfile.name
+            writer = csv.writer(csvfile)
+            writer.writerow([group_by, agg_col])
+            writer.writerows(row.values() for row in data)
+        os.replace(tmp_path, cache_path)
     except Exception as e:
         log.exception(e)
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
     return data
 
@@ -136,17 +323,9 @@ def print_data_csv(data: list, delimiter=',', n_rows=None) -> None:
         if len(data) == 0:
             return 0
 
-        header = ','.join(get_columns(data))
-        print(header)
-
-        for row in data:
-            csv_row = ''
-            for k, v in row.items():
-                if delimiter in str(v):
-                    v = f'"{v}"'
-                csv_row += delimiter + str(v)
-            csv_row = csv_row[1:]
-            print(csv_row)
+        writer = csv.writer(sys.stdout, delimiter=delimiter, lineterminator='\n')
+        writer.writerow(get_columns(data))
+        writer.writerows(row.values() for row in data)
     except Exception as e:
         log.exception(e)
 
@@ -174,6 +353,24 @@ def get_columns(data: list) -> list:
     return columns
 
 
+def get_column_values(data: list, column: str) -> list:
+    """Get values of single column of data
+
+    Parameters
+    ----------
+    data : list
+        Data stored in list of dicts
+    column : str
+        Column name
+
+    Returns
+    -------
+    list
+        List of column values in order of rows
+    """
+    return [row[column] for row in data]
+
+
 def get_shape(data: list) -> tuple:
     """Get shape of data
 
@@ -220,7 +417,43 @@ def get_sorted_data(data: list, sort_by: str, reverse=True) -> list:
     list
         Sorted data stored in list of dicts
     """
-    return sorted(data, key=lambda k: (k[sort_by] is not None, k[sort_by]), reverse=reverse)
+    # sort only not empty values and keep empty ones as the smallest
+    nulls = [row for row in data if row[sort_by] is None]
+    sorted_data = sorted((row for row in data if row[sort_by] is not None),
+                         key=itemgetter(sort_by), reverse=reverse)
+
+    return sorted_data + nulls if reverse else nulls + sorted_data
+
+
+def get_top_data(data: list, column: str, n=None) -> list:
+    """Get n rows with the largest values of column in descending order
+
+    Parameters
+    ----------
+    data : list
+        Data stored in list of dicts
+    column : str
+        Column to rank rows by
+    n : int, optional
+        Number of rows to get, by default None (all rows). Not positive
+        numbers also get all rows
+
+    Returns
+    -------
+    list
+        Top n rows stored in list of dicts
+    """
+    if not n or n < 0:
+        return get_sorted_data(data, column, reverse=True)
+
+    # select with heap of size n instead of sorting all rows
+    top_data = nlargest(n, (row for row in data if row[column] is not None),
+                        key=itemgetter(column))
+    if len(top_data) < n:
+        top_data.extend(sliced_data(
+            [row for row in data if row[column] is None], end=n - len(top_data)))
+
+    return top_data
 
 
 def get_groupped_data(data: list,  group_by: str, agg_column: str, agg_function='mean') -> list:
@@ -245,16 +478,39 @@ def get_groupped_data(data: list,  group_by: str, agg_column: str, agg_function=
     groupped_data = []
 
     for k, v in groupby(data, key=lambda x: x[group_by]):
-        group_row = {group_by: k}
         agg_vals = [float(i[agg_column]) for i in v]
-        group_row[agg_column] = round(mean(agg_vals), 4)
-        groupped_data.append(group_row)
+        groupped_data.append(
+            {group_by: k, agg_column: round(sum(agg_vals) / len(agg_vals), 4)})
 
     return groupped_data
 
 
-def merged_data(data_left: list, data_right: list, join_on: str) -> list:
-    """Merge Join two sorted datasets (tables) into one on unique key
+def _is_sorted(values: list, strict: bool = False) -> bool:
+    """Check if values are sorted in ascending order
+
+    Parameters
+    ----------
+    values : list
+        Values to check
+    strict : bool, optional
+        Flag to require unique values, by default False
+
+    Returns
+    -------
+    bool
+        True if values are sorted, False if not or values are not comparable
+    """
+    try:
+        if strict:
+            return all(a < b for a, b in zip(values, values[1:]))
+        return all(a <= b for a, b in zip(values, values[1:]))
+    except TypeError:
+        return False
+
+
+def merged_data(data_left: list, data_right: list, join_on: str, columns_right: list = None) -> list:
+    """Merge Join two datasets (tables) into one on unique key if both are
+    sorted by it, otherwise Hash Join them
 
     Parameters
     ----------
@@ -264,28 +520,45 @@ def merged_data(data_left: list, data_right: list, join_on: str) -> list:
         Right data stored in list of dicts
     join_on : str
         Common unique column key of two datasets
+    columns_right : list, optional
+        Column names of right data used when it is empty, by default None
 
     Returns
     -------
     list
-        Merged data stored in list of dicts
+        Merged data stored in list of dicts, rows of left data are updated in place
     """
     # get data right columns with None values in case when right table don`t match with left
-    columns_right = data_right[0].keys()
+    if data_right:
+        columns_right = data_right[0].keys()
+    elif columns_right is None:
+        columns_right = []
     right_none = {e: None for e in columns_right if e != join_on}
 
-    merged_data = []
-    data_r_start = 0
-    for row_left in data_left:
-        merged_row = {**row_left, **right_none}
-        for i in range(data_r_start, len(data_right)):
-            if row_left[join_on] == data_right[i][join_on]:
-                merged_row = {**row_left, **data_right[i]}
-                data_r_start = i
-                break
-        merged_data.append(merged_row)
+    keys_left = get_column_values(data_left, join_on)
+    keys_right = get_column_values(data_right, join_on)
+
+    # keys of both tables must be comparable with each other to merge them
+    same_types = not keys_left or not keys_right or type(keys_left[0]) is type(keys_right[0])
+
+    # extend rows of left table in place instead of copying them
+    if same_types and _is_sorted(keys_left) and _is_sorted(keys_right, strict=True):
+        # walk both tables once with two pointers
+        j, n_right = 0, len(data_right)
+        for key, row_left in zip(keys_left, data_left):
+            while j < n_right and keys_right[j] < key:
+                j += 1
+            if j < n_right and keys_right[j] == key:
+                row_left.update(data_right[j])
+            else:
+                row_left.update(right_none)
+    else:
+        # index right table by join key to match every left row in one lookup
+        right_index = dict(zip(keys_right, data_right))
+        for key, row_left in zip(keys_left, data_left):
+            row_left.update(right_index.get(key, right_none))
 
-    return merged_data
+    return data_left
 
 
 def get_factorized_data(data: list, column: str, delimiter=',') -> list:
@@ -332,17 +605,13 @@ def get_categories_of_column(data: list, column: str, delimiter=',') -> list:
     list
         Unique list of categories in variable
     """
-    column_values = ''
-    for row in data:
-        column_values += delimiter + str(row[column])
-
-    splitted = column_values.split(delimiter)[1:]
-    categories = list(set(splitted))
+    categories = list({category for row in data
+                       for category in str(row[column]).split(delimiter)})
 
     return categories
 
 
-def get_data_with_splitted_col(data: list, column: str, new_column: str, old_col_regex: str, new_col_regex: str) -> list:
+def get_data_with_splitted_col(data: list, column: str, new_column: str, old_col_regex: str, new_col_regex: str, new_col_dtype: type = None) -> list:
     """Split column of data and create new column by regular expression
 
     Parameters
@@ -357,24 +626,51 @@ def get_data_with_splitted_col(data: list, column: str, new_column: str, old_col
         RegEx used to remove data from first column
     new_col_regex : str
         RegEx used to create new column
+    new_col_dtype : type, optional
+        Type to convert values of new column to, by default None (strings)
 
     Returns
     -------
     list
         Data stored in list of dicts
     """
+    new_col_pattern = re.compile(new_col_regex)
+    old_col_pattern = re.compile(old_col_regex)
+
     for row in data:
-        if re.search(new_col_regex, row[column]):
-            new_col_val = re.search(new_col_regex, row[column]).group()
+        match = new_col_pattern.search(row[column])
+        if match:
+            new_col_val = match.group()
+            if new_col_dtype:
+                new_col_val = new_col_dtype(new_col_val)
         else:
             new_col_val = None
             log.warning(f'Can`t split column `{column}` in row: {row}')
         row[new_column] = new_col_val
-        row[column] = re.sub(old_col_regex, '', row[column])
+        row[column] = old_col_pattern.sub('', row[column])
 
     return data
 
 
+def _substring_matcher(substring: str):
+    """Get function which checks if value contains substring. Plain substrings
+    are checked with `in` operator, others are used as RegEx
+
+    Parameters
+    ----------
+    substring : str
+        Substring or RegEx
+
+    Returns
+    -------
+    callable
+        Function of value which returns truthy result if value contains substring
+    """
+    if REGEX_META_CHARS.isdisjoint(substring):
+        return lambda value: substring in value
+    return re.compile(substring).search
+
+
 def filtered_data_col_contains(data: list, column: str, substring: str) -> list:
     """Filter data in condition if column contains substring
 
@@ -392,13 +688,118 @@ def filtered_data_col_contains(data: list, column: str, substring: str) -> list:
     list
         Filtered data stored in list of dicts
     """
-    filtered_data = []
+    contains = _substring_matcher(substring)
+    filtered_data = [row for row in data if contains(row[column])]
+
+    return filtered_data
+
+
+def splitted_data_col_contains(data: list, column: str, substrings: list) -> dict:
+    """Split data into parts in condition if column contains each of substrings
+    in a single pass over data
+
+    Parameters
+    ----------
+    data : list
+        Data stored in list of dicts
+    column : str
+        Filtering column
+    substrings : list
+        Substrings of column value
+
+    Returns
+    -------
+    dict
+        Filtered data stored in list of dicts by each of substrings
+    """
+    # match repeated substrings once, they share the same part of data
+    matchers = [(substring, _substring_matcher(substring))
+                for substring in dict.fromkeys(substrings)]
+    splitted_data = {substring: [] for substring in substrings}
 
     for row in data:
-        if re.search(substring, row[column]):
-            filtered_data.append(row)
+        value = row[column]
+        for substring, contains in matchers:
+            if contains(value):
+                splitted_data[substring].append(row)
 
-    return filtered_data
+    return splitted_data
+
+
+def _range_mask(values: list, start=None, end=None) -> list:
+    """Get boolean mask of values which are in range of integers. Comparison
+    is chosen once for given boundaries, None values are out of range
+
+    Parameters
+    ----------
+    values : list
+        Column values
+    start : int, optional
+        Lower boundary of range, by default None
+    end : int, optional
+        Higher boundary of range, by default None
+
+    Returns
+    -------
+    list
+        List of flags for each value
+    """
+    if start and end:
+        return [val is not None and start <= val <= end for val in values]
+    if start:
+        return [val is not None and start <= val for val in values]
+    if end:
+        return [val is not None and val <= end for val in values]
+    return [True] * len(values)
+
+
+def get_top_data_col_contains(data: list, column: str, substrings: list, sort_by: str, n: int) -> dict:
+    """Get n rows with the largest values of sort_by column for each of substrings
+    contained in column in a single pass over data
+
+    Parameters
+    ----------
+    data : list
+        Data stored in list of dicts
+    column : str
+        Filtering column
+    substrings : list
+        Substrings of column value
+    sort_by : str
+        Column to rank rows by
+    n : int
+        Number of rows to get for each of substrings, not positive numbers
+        get all rows as in get_top_data
+
+    Returns
+    -------
+    dict
+        Top n rows stored in list of dicts by each of substrings
+    """
+    if not n or n < 0:
+        return {substring: get_top_data(rows, sort_by)
+                for substring, rows in splitted_data_col_contains(data, column, substrings).items()}
+
+    # match repeated substrings once, they share the same heap
+    matchers = [(substring, _substring_matcher(substring))
+                for substring in dict.fromkeys(substrings)]
+    heaps = {substring: [] for substring in substrings}
+
+    for i, row in enumerate(data):
+        value = row[column]
+        for substring, contains in matchers:
+            if contains(value):
+                # empty values are the smallest, earlier rows win ties
+                sort_val = row[sort_by]
+                item = (sort_val is not None, sort_val or 0, -i, row)
+                heap = heaps[substring]
+                if len(heap) < n:
+                    heappush(heap, item)
+                elif item[:3] > heap[0][:3]:
+                    heapreplace(heap, item)
+
+    return {substring: [item[-1] for item in sorted(heap, key=lambda item: item[:3], reverse=True)]
+            for substring, heap in heaps.items()}
 
 
 def filtered_data_col_in_range(data: list, column: str, start=None, end=None) -> list:
@@ -420,35 +821,14 @@ def filtered_data_col_in_range(data: list, column: str, start=None, end=None) ->
     list
         Filtered data stored in list of dict
     """
-    filtered_data = []
-
-    if start and end:
-        if start > end:
-            return None
-
-        for row in data:
-            if not row[column]:
-                continue
-
-            val = int(row[column])
-            if start >= val and val <= end:
-                filtered_data.append(row)
-    elif start:
-        for row in data:
-            if not row[column]:
-                continue
-
-            if start <= int(row[column]):
-                filtered_data.append(row)
-    elif end:
-        for row in data:
-            if not row[column]:
-                continue
-
-            if int(row[column]) <= end:
-                filtered_data.append(row)
-    else:
+    if not start and not end:
         return data
+    if start and end and start > end:
+        return None
+
+    # build boolean mask over column values and apply it to rows
+    mask = _range_mask(get_column_values(data, column), start, end)
+    filtered_data = list(compress(data, mask))
 
     return filtered_data
 
@@ -496,6 +876,33 @@ def sliced_data(data: list, start=None, end=None) -> list:
     return data
 
 
+def positive_int(value: str) -> int:
+    """Convert argument to positive integer
+
+    Parameters
+    ----------
+    value : str
+        Argument value
+
+    Returns
+    -------
+    int
+        Positive integer
+
+    Raises
+    ------
+    argparse.ArgumentTypeError
+        If value is not a positive integer
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f'{value} is not a positive integer')
+    return number
+
+
 def get_arguments() -> dict:
     """Construct the argument parser and get the arguments
 
@@ -505,7 +912,7 @@ def get_arguments() -> dict:
         Dictionary of arguments and paramenters
     """
     ap = argparse.ArgumentParser(description=__doc__)
-    ap.add_argument("-n", "--topN", type=int,
+    ap.add_argument("-n", "--topN", type=positive_int,
                     help="the number of top rated movies for each genre. (example: 3)")
     ap.add_argument("-g", "--genres", type=str,
                     help="user-defined genre filter. can be multiple. (example: Comedy|Adventure)")
@@ -515,6 +922,10 @@ def get_arguments() -> dict:
                     help="the lower boundary of year filter (example: 2010)")
     ap.add_argument("-r", "--regexp", type=str,
                     help="filter on name of the film (example: love)")
+    ap.add_argument("-j", "--jobs", type=int, default=1,
+                    help="the number of processes reading ratings.csv (example: 4)")
+    ap.add_argument("--no_cache", action="store_true",
+                    help="read ratings.csv instead of its cached averages")
 
     return vars(ap.parse_args())
 
@@ -537,14 +948,14 @@ def main():
 
     # read movies.csv
     log.info('reading movies.csv')
-    movies = read_csv(DATA_FOLDER_PATH + 'movies.csv')
+    movies = read_csv(DATA_FOLDER_PATH + 'movies.csv', dtypes={'movieId': int})
     log.info('Done!')
     log.debug(data_info(movies))
 
     # get year column from title
     log.info('splitting title to year')
     movies = get_data_with_splitted_col(movies, 'title', 'year',
-                                        r'\s\(\d\d\d\d\)', r'\d\d\d\d')
+                                        r'\s\(\d\d\d\d\)', r'\d\d\d\d', new_col_dtype=int)
     log.info('Done!')
     log.debug(data_info(movies))
 
@@ -572,43 +983,46 @@ def main():
 
     # read ratings.csv
     log.info('reading ratings.csv')
-    ratings = get_groupped_data_from_file(
-        DATA_FOLDER_PATH + 'ratings.csv', 'movieId', 'rating')
+    if args['no_cache']:
+        # aggregate only ratings of movies left after filtering
+        ratings = get_groupped_data_from_file(
+            DATA_FOLDER_PATH + 'ratings.csv', 'movieId', 'rating',
+            keys={row['movieId'] for row in movies},
+            n_jobs=args['jobs'],
+            group_dtype=int)
+    else:
+        ratings = get_groupped_data_cached(
+            DATA_FOLDER_PATH + 'ratings.csv', 'movieId', 'rating',
+            DATA_FOLDER_PATH + 'ratings.agg.csv',
+            n_jobs=args['jobs'],
+            group_dtype=int)
     log.info('Done!')
     log.debug(data_info(ratings))
 
-    # sort ratings
-    log.info('sorting ratings by movieId')
-    ratings = get_sorted_data(ratings, 'movieId', reverse=False)
-    log.info('Done!')
-
     # merge data
     log.info('merging movies and ratings')
-    data = merged_data(movies, ratings, 'movieId')
+    data = merged_data(movies, ratings, 'movieId',
+                       columns_right=['movieId', 'rating'])
     log.info('Done!')
     log.debug(data_info(data))
 
-    # sort data
-    log.info('sorting data by rating')
-    data = get_sorted_data(data, 'rating', reverse=True)
-    log.info('Done!')
-
     if args['genres']:
         genres = args['genres'].split('|')
-        stacked_data = []
-        for genre in genres:
-            log.info(f'working with {genre}')
-            stacked_data.extend(
-                sliced_data(
-                    filtered_data_col_contains(data, 'genres', genre),
-                    end=args['topN'])
-            )
-            log.info(f'{genre} genre added to output')
+        log.info('getting top rated data by genres')
+        genres_data = get_top_data_col_contains(
+            data, 'genres', genres, 'rating', args['topN'])
+        log.info('Done!')
+        log.info('stacking data of genres')
+        stacked_data = list(chain.from_iterable(genres_data[genre] for genre in genres))
+        log.info('Done!')
         print_data_csv(stacked_data)
         log.info('result printed')
         log.debug(data_info(stacked_data))
     else:
-        print_data_csv(data, n_rows=args['topN'])
+        log.info('getting top rated data')
+        data = get_top_data(data, 'rating', args['topN'])
+        log.info('Done!')
+        print_data_csv(data)
         log.info('result printed')
 
     time_elapsed = time.perf_counter() - time_start